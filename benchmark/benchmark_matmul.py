@@ -1,15 +1,47 @@
 import argparse
+import functools
 import itertools
 import logging
 
+import torch
+
 import tilelang as tl
 import tilelang.language as T
+from tilelang import tvm
 from tilelang.autotuner import autotune, jit
+from tilelang.contrib import nvcc
+from tilelang.utils.target import determine_target
 
 # Configure logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# Maximum (opt-in) shared memory per thread block in bytes, keyed by compute capability.
+# Only used when the limit cannot be queried from the device.
+SMEM_BYTES_PER_BLOCK = {
+    (7, 0): 96 * 1024,
+    (7, 5): 64 * 1024,
+    (8, 0): 163 * 1024,
+    (8, 6): 99 * 1024,
+    (8, 7): 163 * 1024,
+    (8, 9): 99 * 1024,
+    (9, 0): 227 * 1024,
+}
+# Conservative fallback when the architecture cannot be queried
+DEFAULT_SMEM_BYTES = 48 * 1024
+# LDS capacity per workgroup on CDNA devices
+HIP_SMEM_BYTES = 64 * 1024
+# Compiled JIT contexts keyed by target, shape and tuning configuration. The cache is
+# unbounded: a single matmul(...) call walks every configuration once, so a bounded LRU
+# would evict all of them before a repeated call could hit.
+JIT_CONTEXT_CACHE = {}
+
+# Hardware limits of a thread block launch
+WARP_SIZE = 32
+MAX_THREADS_PER_BLOCK = 1024
+# Hardware limit of 32-bit registers addressable by a single thread
+MAX_REGS_PER_THREAD = 255
+
 
 def ref_program(A, B):
     """
@@ -17,33 +49,109 @@ def ref_program(A, B):
 
     Parameters
     ----------
-    A : numpy.ndarray
+    A : torch.Tensor
         The matrix with shape (M, K).
-    B : numpy.ndarray
+    B : torch.Tensor
         The matrix with shape (N, K).
 
     Returns
     -------
-    np.ndarray
+    torch.Tensor
         The result of A @ B.T, shape (M, N).
     """
     return A @ B.T
 
 
-def get_configs(M, N, K, with_roller=False):
+def get_smem_bytes(target):
     """
-    Generate a list of configuration dictionaries that will be used for tuning.
+    Query the shared memory budget of a thread block on the given target.
+
+    The opt-in limit is read from the current CUDA device. `SMEM_BYTES_PER_BLOCK`
+    is consulted only when the device cannot be queried, and unknown
+    architectures fall back to `DEFAULT_SMEM_BYTES` with a warning.
+
+    Parameters
+    ----------
+    target : str
+        The compilation target, as returned by `determine_target`.
+
+    Returns
+    -------
+    int
+        The number of shared memory bytes a single thread block may use.
+    """
+    if target == "hip":
+        return HIP_SMEM_BYTES
+    if torch.cuda.is_available():
+        props = torch.cuda.get_device_properties(torch.cuda.current_device())
+        smem_bytes = getattr(props, "shared_memory_per_block_optin", None)
+        if smem_bytes:
+            return smem_bytes
+    try:
+        compute_version = nvcc.get_target_compute_version()
+    except ValueError:
+        compute_version = None
+    if compute_version is not None:
+        major, minor = nvcc.parse_compute_version(compute_version)
+        if (major, minor) in SMEM_BYTES_PER_BLOCK:
+            return SMEM_BYTES_PER_BLOCK[(major, minor)]
+    logger.warning(f"Unknown shared memory limit for compute capability {compute_version}, "
+                   f"falling back to {DEFAULT_SMEM_BYTES} bytes per block.")
+    return DEFAULT_SMEM_BYTES
+
+
+def is_valid_config(block_M,
+                    block_N,
+                    block_K,
+                    num_stages,
+                    thread_num,
+                    accum_dtype="float",
+                    smem_bytes=DEFAULT_SMEM_BYTES):
+    """
+    Cheap analytic filter rejecting configurations that can never launch,
+    so that they are pruned before being compiled and profiled.
+
+    Parameters
+    ----------
+    smem_bytes : int
+        Shared memory budget of a thread block, see `get_smem_bytes`.
+
+    Returns
+    -------
+    bool
+        False if the configuration exceeds the thread, shared memory or register budget.
+    """
+    # A block must hold at least one full warp and stay within the launch limit
+    if thread_num % WARP_SIZE != 0 or not WARP_SIZE <= thread_num <= MAX_THREADS_PER_BLOCK:
+        return False
+    # Pipelined A/B tiles in float16, a non-pipelined loop still holds one stage
+    if (block_M + block_N) * block_K * 2 * max(num_stages, 1) > smem_bytes:
+        return False
+    # Accumulators of C_local are spread across the 32-bit registers of the block threads
+    accum_bytes = tvm.DataType(accum_dtype).bits // 8
+    if block_M * block_N * accum_bytes // 4 // thread_num > MAX_REGS_PER_THREAD:
+        return False
+    return True
+
+
+def get_configs(M, N, K, with_roller=False, with_fp16_accum=False):
+    """
+    Generate the configuration dictionaries that will be used for tuning.
     
     Parameters
     ----------
     with_roller : bool
         Whether to enable bitblas roller to deduce search spaces
+    with_fp16_accum : bool
+        Whether to also tune half-precision accumulation
 
     Returns
     -------
-    list of dict
+    iterable of dict
         Each configuration dict includes various block sizes, pipeline stages,
         thread numbers, and other parameters to explore during autotuning.
+        Without the roller, configurations are yielded lazily and the ones
+        exceeding the target's shared memory or register budget are skipped.
     """
     if with_roller:
         from bitblas.base.utils import get_roller_hints_from_func
@@ -83,7 +191,10 @@ def get_configs(M, N, K, with_roller=False):
             config["block_K"] = hint.rstep[0]
             config["num_stages"] = 0
             config["thread_num"] = (block_m * block_n) // (warp_m * warp_n) * 32
-            config["enable_rasteration"] = hint.rasterization_plan is not NoRasterization
+            config["accum_dtype"] = "float"
+            # Rasterized hints use the default panel size of 10
+            config["swizzle_factor"] = (1 if isinstance(hint.rasterization_plan, NoRasterization)
+                                        else 10)
             configs.append(config)
         for config in configs:
             print(config)
@@ -92,34 +203,176 @@ def get_configs(M, N, K, with_roller=False):
         block_M = [64, 128, 256]
         block_N = [64, 128, 256]
         block_K = [32, 64]
-        num_stages = [0, 1, 2, 3]
+        num_stages = [0, 2, 3, 4, 5]
         thread_num = [128, 256]
-        enable_rasterization = [True, False]
-
-        _configs = list(
-            itertools.product(
-                block_M,
-                block_N,
-                block_K,
-                num_stages,
-                thread_num,
-                enable_rasterization,
-            ))
-
-        configs = [
-            {
-                "block_M": c[0],
-                "block_N": c[1],
-                "block_K": c[2],
-                "num_stages": c[3],
-                "thread_num": c[4],
-                "enable_rasteration": c[5],  # keep param name for backward-compat
-            } for c in _configs
-        ]
+        # Rasterization panel size, a factor of 1 disables rasterization
+        swizzle_factor = [1, 2, 4, 8]
+        # Half-precision accumulation doubles tensor core throughput and halves the
+        # accumulator register footprint at the cost of accuracy
+        accum_dtype = ["float16", "float"] if with_fp16_accum else ["float"]
+
+        smem_bytes = get_smem_bytes(determine_target())
+
+        def _iter_configs():
+            # Feasibility does not depend on the swizzle factor, so filter the tile
+            # and launch axes once and only expand the survivors
+            feasible = [
+                c for c in itertools.product(
+                    block_M,
+                    block_N,
+                    block_K,
+                    num_stages,
+                    thread_num,
+                    accum_dtype,
+                ) if is_valid_config(*c, smem_bytes=smem_bytes)
+            ]
+            for c, factor in itertools.product(feasible, swizzle_factor):
+                yield {
+                    "block_M": c[0],
+                    "block_N": c[1],
+                    "block_K": c[2],
+                    "num_stages": c[3],
+                    "thread_num": c[4],
+                    "accum_dtype": c[5],
+                    "swizzle_factor": factor,
+                }
+
+        configs = _iter_configs()
     return configs
 
 
-def matmul(M, N, K, with_roller):
+def cache_jit_context(*key):
+    """
+    Memoize the JIT contexts returned by a jit-decorated kernel, keyed by
+    `key` together with the tuning arguments of each call.
+
+    Parameters
+    ----------
+    key : tuple
+        Values identifying the kernel beyond its arguments, e.g. shape and target.
+
+    Returns
+    -------
+    Callable
+        A decorator returning the cached JIT context when available.
+    """
+
+    def decorator(fn):
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache_key = (*key, *args, *sorted(kwargs.items()))
+            if cache_key not in JIT_CONTEXT_CACHE:
+                JIT_CONTEXT_CACHE[cache_key] = fn(*args, **kwargs)
+            return JIT_CONTEXT_CACHE[cache_key]
+
+        return wrapper
+
+    return decorator
+
+
+def matmul_program(
+    M,
+    N,
+    K,
+    block_M,
+    block_N,
+    block_K,
+    num_stages,
+    thread_num,
+    swizzle_factor,
+    accum_dtype,
+):
+    """
+    Build the TVM Tensor Language function computing C = A @ B^T for one
+    tuning configuration.
+
+    Parameters
+    ----------
+    M, N, K : int
+        The dimensions of the matrix multiplication.
+    block_M, block_N, block_K, num_stages, thread_num, swizzle_factor : int
+        The tuning configuration, see `matmul`.
+    accum_dtype : str
+        The data type of the accumulation buffer.
+
+    Returns
+    -------
+    Function
+        A TVM Tensor Language function (T.prim_func) that computes matmul.
+    """
+    # Use half-precision for input data to reduce memory bandwidth
+    dtype = "float16"
+
+    # The shape is fixed per program, fold the grid and the K loop extent into
+    # literals instead of leaving ceildiv expressions to the TIR lowering
+    grid_x = (N + block_N - 1) // block_N
+    grid_y = (M + block_M - 1) // block_M
+    k_tiles = (K + block_K - 1) // block_K
+
+    @T.prim_func
+    def main(
+            A: T.Buffer((M, K), dtype),
+            B: T.Buffer((N, K), dtype),
+            C: T.Buffer((M, N), dtype),
+    ):
+        """
+        The compiled TVM function for block-level matrix multiplication.
+
+        - We divide the entire (M, N) domain into blocks of shape
+          (block_M, block_N).
+        - Each block has its own allocated shared memory for sub-blocks
+          of A and B.
+        - The partial results go into C_local, and then we copy them back
+          to global memory C.
+        """
+        # Bind x-dimension to block index in N,
+        #     y-dimension to block index in M.
+        with T.Kernel(grid_x, grid_y, threads=thread_num) as (bx, by):
+
+            # Allocate shared memory for A sub-block of shape (block_M, block_K)
+            A_shared = T.alloc_shared((block_M, block_K), dtype)
+            # Allocate shared memory for B sub-block of shape (block_N, block_K)
+            B_shared = T.alloc_shared((block_N, block_K), dtype)
+            # Allocate a local fragment for intermediate accumulation
+            C_local = T.alloc_fragment((block_M, block_N), accum_dtype)
+
+            # Swizzle blocks in panels of swizzle_factor for better L2 reuse (1 disables it)
+            T.use_swizzle(panel_size=swizzle_factor, enable=swizzle_factor > 1)
+
+            # Clear out the accumulation buffer
+            T.clear(C_local)
+
+            # Loop over sub-blocks in K dimension, pipelined by num_stages.
+            # With num_stages > 0 the global->shared copies below are lowered to
+            # cp.async on SM80+, num_stages = 0 keeps them synchronous.
+            for k in T.Pipelined(k_tiles, num_stages=num_stages):
+                # Load a sub-block of A from global memory into A_shared
+                T.copy(
+                    A[by * block_M, k * block_K],
+                    A_shared,
+                )
+                # Load a sub-block of B from global memory into B_shared
+                T.copy(
+                    B[bx * block_N, k * block_K],
+                    B_shared,
+                )
+                # Perform a partial matrix multiplication:
+                #   C_local += A_shared @ B_shared^T
+                # The shared->register operand loads are issued with ldmatrix
+                T.gemm(
+                    A_shared,
+                    B_shared,
+                    C_local,
+                    transpose_B=True,
+                )
+            # Write back the results from C_local to the global memory C
+            T.copy(C_local, C[by * block_M, bx * block_N])
+
+    return main
+
+
+def matmul(M, N, K, with_roller, with_fp16_accum=False):
     """
     Create an autotuned matrix multiplication kernel for matrices of shape:
       - A: (M, K)
@@ -134,6 +387,10 @@ def matmul(M, N, K, with_roller):
         The dimension N of the matrix multiplication.
     K : int
         The dimension K of the matrix multiplication.
+    with_fp16_accum : bool
+        Whether to also tune half-precision accumulation. The results of every
+        configuration are then checked against the reference program, allowing
+        at most 1% mismatched elements.
 
     Returns
     -------
@@ -150,6 +407,9 @@ def matmul(M, N, K, with_roller):
     #  - Tuning config list
     #  - Profiling keys
     #  - Warmup and repetition counts for better measurement
+    #  - CUDA graph replay of the repetitions to hide the launch overhead (CUDA only)
+    #  - Compilation of the next config overlapped with profiling of the current one
+    #  - Compiled kernels cached per target, shape and configuration
     #  - A reference program for correctness verification
     #  - The "tvm" profiler backend
     #  - HIP as the compilation target (modify as needed for your hardware)
@@ -161,24 +421,34 @@ def matmul(M, N, K, with_roller):
             raise ImportError(
                 "BitBlas is not installed. Please install it via 'pip install bitblas'.") from e
 
+    # Reduced precision accumulation is only accepted once verified against the reference
+    skip_check = not with_fp16_accum
+    # A replayed graph is timed without host-side launches, so the compile thread holding
+    # the GIL does not perturb the measurement and can safely run ahead.
+    use_cuda_graph = determine_target() == "cuda"
+
     @autotune(
-        configs=get_configs(M, N, K, with_roller),
+        configs=get_configs(M, N, K, with_roller, with_fp16_accum),
         keys=[
             "block_M",
             "block_N",
             "block_K",
             "num_stages",
             "thread_num",
-            "enable_rasteration",
+            "swizzle_factor",
+            "accum_dtype",
         ],
         warmup=3,
         rep=5,
+        use_cuda_graph=use_cuda_graph,
+        prefetch_compile=use_cuda_graph,
     )
+    @cache_jit_context(determine_target(), M, N, K, skip_check)
     @jit(
         out_idx=[2],
         supply_type=tl.TensorSupplyType.Integer,
         ref_prog=ref_program,
-        skip_check=True,
+        skip_check=skip_check,
         profiler="auto",
         target="auto",
     )
@@ -188,7 +458,8 @@ def matmul(M, N, K, with_roller):
         block_K=None,
         num_stages=None,
         thread_num=None,
-        enable_rasteration=None,
+        swizzle_factor=None,
+        accum_dtype=None,
     ):
         """
         The actual kernel to compute C = A @ B^T.
@@ -202,11 +473,15 @@ def matmul(M, N, K, with_roller):
         block_K : int
             Block size in K dimension.
         num_stages : int
-            Number of pipelined stages (for asynchronous load).
+            Number of pipelined stages (for asynchronous load),
+            0 disables the pipeline and the cp.async global loads.
         thread_num : int
             Number of threads to use per block.
-        enable_rasteration : bool
-            Whether to enable rasterization (swizzling) optimization.
+        swizzle_factor : int
+            Panel size of the rasterization (swizzling) optimization,
+            1 disables rasterization.
+        accum_dtype : str
+            Data type of the accumulation buffer, "float16" trades accuracy for throughput.
         k_pack : int
             K dimension packing factor to improve memory coalescing.
 
@@ -215,69 +490,18 @@ def matmul(M, N, K, with_roller):
         Function
             A TVM Tensor Language function (T.prim_func) that computes matmul.
         """
-        # Use half-precision for input data to reduce memory bandwidth,
-        # accumulate in float for better numerical accuracy
-        dtype = "float16"
-        accum_dtype = "float"
-
-        @T.prim_func
-        def main(
-                A: T.Buffer((M, K), dtype),
-                B: T.Buffer((N, K), dtype),
-                C: T.Buffer((M, N), dtype),
-        ):
-            """
-            The compiled TVM function for block-level matrix multiplication.
-
-            - We divide the entire (M, N) domain into blocks of shape
-              (block_M, block_N).
-            - Each block has its own allocated shared memory for sub-blocks
-              of A and B.
-            - The partial results go into C_local, and then we copy them back
-              to global memory C.
-            """
-            # Bind x-dimension to block index in N,
-            #     y-dimension to block index in M.
-            with T.Kernel(
-                    T.ceildiv(N, block_N), T.ceildiv(M, block_M), threads=thread_num) as (bx, by):
-
-                # Allocate shared memory for A sub-block of shape (block_M, block_K)
-                A_shared = T.alloc_shared((block_M, block_K), dtype)
-                # Allocate shared memory for B sub-block of shape (block_N, block_K)
-                B_shared = T.alloc_shared((block_N, block_K), dtype)
-                # Allocate a local fragment for intermediate accumulation
-                C_local = T.alloc_fragment((block_M, block_N), accum_dtype)
-
-                # Enable (or disable) swizzling optimization
-                T.use_swizzle(panel_size=10, enable=enable_rasteration)
-
-                # Clear out the accumulation buffer
-                T.clear(C_local)
-
-                # Loop over sub-blocks in K dimension, pipelined by num_stages
-                for k in T.Pipelined(T.ceildiv(K, block_K), num_stages=num_stages):
-                    # Load a sub-block of A from global memory into A_shared
-                    T.copy(
-                        A[by * block_M, k * block_K],
-                        A_shared,
-                    )
-                    # Load a sub-block of B from global memory into B_shared
-                    T.copy(
-                        B[bx * block_N, k * block_K],
-                        B_shared,
-                    )
-                    # Perform a partial matrix multiplication:
-                    #   C_local += A_shared @ B_shared^T
-                    T.gemm(
-                        A_shared,
-                        B_shared,
-                        C_local,
-                        transpose_B=True,
-                    )
-                # Write back the results from C_local to the global memory C
-                T.copy(C_local, C[by * block_M, bx * block_N])
-
-        return main
+        return matmul_program(
+            M,
+            N,
+            K,
+            block_M,
+            block_N,
+            block_K,
+            num_stages,
+            thread_num,
+            swizzle_factor,
+            accum_dtype,
+        )
 
     return kernel()
 
@@ -293,16 +517,22 @@ if __name__ == "__main__":
         action="store_true",
         help="Whether to enable BitBLAS roller for search space",
     )
+    parser.add_argument(
+        "--with_fp16_accum",
+        action="store_true",
+        help="Whether to also tune float16 accumulation, verified against the reference",
+    )
     args = parser.parse_args()
 
     M, N, K = args.m, args.n, args.k
     with_roller = args.with_roller
+    with_fp16_accum = args.with_fp16_accum
 
     # Compute total floating-point operations to measure throughput
     total_flops = 2 * M * N * K
 
     # matmul(...) returns (best_latency, best_config, ref_latency)
-    best_latency, best_config, ref_latency = matmul(M, N, K, with_roller)
+    best_latency, best_config, ref_latency = matmul(M, N, K, with_roller, with_fp16_accum)
 
     # Print out the benchmark results
     print(f"Best latency (s): {best_latency}")
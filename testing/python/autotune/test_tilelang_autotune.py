@@ -3,11 +3,12 @@
 
 import itertools
 import logging
+import time
 
 import tilelang as tl
 import tilelang.testing
 import tilelang.language as T
-from tilelang.autotuner import autotune, jit
+from tilelang.autotuner import autotune, jit, JITContext
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -293,5 +294,57 @@ def test_autotune_matmul():
     matmul(8192, 8192, 8192, with_roller=False)
 
 
+def check_autotune_slow_compile(prefetch_compile):
+    tuned = []
+
+    class FakeProfiler:
+
+        def __init__(self, value):
+            self.value = value
+            self.func = None
+
+        def _get_inputs(self, with_output=False):
+            return []
+
+        def do_bench(self, func, **kwargs):
+            tuned.append(self.value)
+            return float(self.value)
+
+    @autotune(
+        configs=[dict(value=value) for value in (3, 2, 1)],
+        keys=["value"],
+        warmup=1,
+        rep=1,
+        timeout=1,
+        prefetch_compile=prefetch_compile)
+    def kernel(value=None):
+        # The first config compiles past the timeout and keeps the compile worker busy
+        if value == 3:
+            time.sleep(2)
+        return JITContext(
+            mod=FakeProfiler(value),
+            out_idx=[],
+            supply_type=tl.TensorSupplyType.Normal,
+            ref_prog=None,
+            rtol=1e-2,
+            atol=1e-2,
+            skip_check=True,
+            profiler="torch",
+            target="cuda")
+
+    best_latency, best_config, _ = kernel()
+    assert tuned == [2, 1]
+    assert best_config == {"value": 1}
+    assert best_latency == 1.0
+
+
+def test_autotune_slow_compile():
+    check_autotune_slow_compile(prefetch_compile=False)
+
+
+def test_autotune_slow_compile_prefetch():
+    check_autotune_slow_compile(prefetch_compile=True)
+
+
 if __name__ == "__main__":
     tilelang.testing.main()
@@ -1,4 +1,41 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
-# TODO: implement this test for tilelang/language/kernel.py
+from tilelang import tvm as tvm
+import tilelang.testing
+import tilelang.language as T
+from tvm.script.ir_builder import IRBuilder
+from tvm.script.ir_builder import tir as tir_builder
+
+
+def check_launch_extents(blocks, threads):
+    with IRBuilder():
+        with tir_builder.prim_func():
+            with T.Kernel(*blocks, threads=threads):
+                frame = T.KernelLaunchFrame.Current()
+
+                # Compare against the extents of the underlying launch frames
+                for dim, extent in enumerate(blocks):
+                    expected = int(frame.frames[dim].iter_var.dom.extent)
+                    assert frame.get_block_extent(dim) == expected == extent
+
+                num_threads = 1
+                for dim in range(3):
+                    expected = int(frame.frames[-4 + dim].iter_var.dom.extent)
+                    assert frame.get_thread_extent(dim) == expected
+                    num_threads *= expected
+                assert frame.get_num_threads() == frame.num_threads == num_threads
+
+                T.evaluate(0)
+
+
+def test_kernel_launch_extents_1d():
+    check_launch_extents([8], 128)
+
+
+def test_kernel_launch_extents_3d():
+    check_launch_extents([2, 3, 4], [32, 4, 2])
+
+
+if __name__ == "__main__":
+    tilelang.testing.main()
@@ -0,0 +1,88 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import pytest
+import torch
+
+import tilelang.testing
+import tilelang as tl
+from tilelang.profiler import do_bench
+
+
+def elementwise_add(M, N, block_M, block_N, dtype="float16", threads=128):
+    import tilelang.language as T
+
+    @T.prim_func
+    def main(
+            A: T.Buffer((M, N), dtype),
+            B: T.Buffer((M, N), dtype),
+            C: T.Buffer((M, N), dtype),
+    ):
+        with T.Kernel(T.ceildiv(N, block_N), T.ceildiv(M, block_M), threads=threads) as (bx, by):
+            for (local_y, local_x) in T.Parallel(block_M, block_N):
+                y = by * block_M + local_y
+                x = bx * block_N + local_x
+                C[y, x] = A[y, x] + B[y, x]
+
+    return main
+
+
+def get_profiler(M=256, N=256, supply_type=tl.TensorSupplyType.Integer):
+    mod, params = tl.lower(elementwise_add(M, N, 64, 64))
+    return tl.Profiler(mod, params, [2], supply_type)
+
+
+@tilelang.testing.requires_cuda
+def test_integer_supply_not_shared():
+    profiler = get_profiler()
+    A, B = profiler._get_inputs()
+    # Params of the same shape and dtype must get distinct tensors
+    assert A.data_ptr() != B.data_ptr()
+    A_next, _ = profiler._get_inputs()
+    assert A.data_ptr() != A_next.data_ptr()
+
+
+@tilelang.testing.requires_cuda
+def test_do_bench_auto_reuses_input_tensors():
+    profiler = get_profiler()
+    input_tensors = profiler._get_inputs()
+
+    supplied = []
+    supply = profiler.supply
+
+    def counting_supply(param):
+        supplied.append(param)
+        return supply(param)
+
+    profiler.supply = counting_supply
+    latency = profiler.do_bench(
+        profiler.func, n_warmup=1, n_repeat=1, profiler="auto", input_tensors=input_tensors)
+    assert latency > 0
+    # Only the output buffer of the tvm time evaluator is supplied
+    assert len(supplied) == 1
+
+
+@tilelang.testing.requires_cuda
+def test_do_bench_cuda_graph():
+    profiler = get_profiler()
+    latency = profiler.do_bench(
+        profiler.func, n_warmup=1, n_repeat=4, profiler="torch", use_cuda_graph=True)
+    assert latency > 0
+
+
+@tilelang.testing.requires_cuda
+def test_do_bench_cuda_graph_torch_fn():
+    A = torch.randn(512, 512, device="cuda", dtype=torch.float16)
+    latency = do_bench(lambda: A @ A.T, _n_warmup=1, _n_repeat=4, use_cuda_graph=True)
+    assert latency > 0
+
+
+@tilelang.testing.requires_cuda
+def test_do_bench_cuda_graph_tvm_profiler_unsupported():
+    profiler = get_profiler()
+    with pytest.raises(AssertionError):
+        profiler.do_bench(profiler.func, profiler="tvm", use_cuda_graph=True)
+
+
+if __name__ == "__main__":
+    tilelang.testing.main()
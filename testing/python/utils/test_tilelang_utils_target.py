@@ -0,0 +1,42 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import pytest
+from tilelang import tvm as tvm
+import tilelang.testing
+from tvm.target import Target
+from tilelang.utils.target import determine_target, _determine_target
+
+
+def test_determine_target_string():
+    assert determine_target("cuda") == "cuda"
+    assert determine_target("hip") == "hip"
+    assert determine_target("llvm") == "llvm"
+
+
+def test_determine_target_return_object():
+    target = determine_target("llvm", return_object=True)
+    assert isinstance(target, Target)
+    assert target.kind.name == "llvm"
+
+
+def test_determine_target_passes_target_through():
+    target = Target("llvm")
+    assert determine_target(target) is target
+    assert isinstance(determine_target(target, return_object=True), Target)
+
+
+def test_determine_target_cached():
+    determine_target("cuda")
+    hits = _determine_target.cache_info().hits
+    assert determine_target("cuda") == "cuda"
+    assert _determine_target.cache_info().hits == hits + 1
+
+
+def test_determine_target_invalid():
+    with pytest.raises(AssertionError):
+        determine_target("not-a-target")
+
+
+if __name__ == "__main__":
+    tilelang.testing.main()
@@ -42,6 +42,8 @@ class Autotuner:
         warmup: int = 25,
         rep: int = 100,
         timeout: int = 30,
+        use_cuda_graph: bool = False,
+        prefetch_compile: bool = False,
     ):
         self.fn = fn
         self.configs = configs
@@ -49,6 +51,8 @@ class Autotuner:
         self.warmup = warmup
         self.rep = rep
         self.timeout = timeout
+        self.use_cuda_graph = use_cuda_graph
+        self.prefetch_compile = prefetch_compile
 
         # Precompute cached variables
         self.ref_latency_cache = None
@@ -63,9 +67,16 @@ class Autotuner:
         best_latency = 1e8
         best_config = None
 
-        def target_fn(*new_args, **kwds):
-            jit_context = self.fn(*new_args, **kwds)
+        def compile_fn(config):
+            new_args = []
+            for name, value in bound_args.arguments.items():
+                if name not in self.keys:
+                    new_args.append(value)
+                else:
+                    new_args.append(config[name])
+            return self.fn(*new_args, **kwds)
 
+        def target_fn(jit_context):
             # Unpack the context
             mod = jit_context.mod
             profiler = jit_context.profiler
@@ -86,7 +97,8 @@ class Autotuner:
                 n_warmup=self.warmup,
                 n_repeat=self.rep,
                 profiler=profiler,
-                input_tensors=self.jit_input_tensors)
+                input_tensors=self.jit_input_tensors,
+                use_cuda_graph=self.use_cuda_graph)
             if self.ref_latency_cache is None and ref_prog is not None:
                 self.ref_input_tensors = mod._get_inputs(
                     with_output=False) if self.ref_input_tensors is None else self.ref_input_tensors
@@ -95,40 +107,59 @@ class Autotuner:
                     n_warmup=self.warmup,
                     n_repeat=self.rep,
                     profiler="torch",
-                    input_tensors=self.ref_input_tensors)
+                    input_tensors=self.ref_input_tensors,
+                    use_cuda_graph=self.use_cuda_graph)
 
             return latency, self.ref_latency_cache
 
         progress_bar = tqdm(self.configs, desc="Running configurations")
-        for config in progress_bar:
-            new_args = []
-            for name, value in bound_args.arguments.items():
-                if name not in self.keys:
-                    new_args.append(value)
-                else:
-                    new_args.append(config[name])
-            new_args = tuple(new_args)
-            ref_latency = None
-            try:
-                # Use ThreadPoolExecutor to enforce timeout on target_fn execution
-                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(target_fn, *new_args, **kwds)
-                    latency, ref_latency = future.result(timeout=self.timeout)
-            except concurrent.futures.TimeoutError:
-                logging.error(f"Timeout exceeded for config {config}. Skipping this configuration.")
-                continue
-            except Exception as e:
-                logging.error(f"An error occurred while testing config {config}: {e}")
-                continue
-
-            logging.info(f"Config {config} latency: {latency}")
-
-            progress_bar.set_postfix({"best_latency": best_latency})
-
-            if latency < best_latency:
-                best_latency = latency
-                best_config = config
-            tqdm.write(f"Tuned Latency {latency} with config {config}")
+        config_iter = iter(progress_bar)
+        ref_latency = None
+        # Configurations are compiled on a background thread. With prefetch_compile the
+        # next one is compiled while the current one is profiled, which overlaps codegen
+        # with the GPU measurement but lets the compile thread contend for the GIL
+        # inside the timed region.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as compile_executor:
+
+            def submit_next():
+                config = next(config_iter, None)
+                if config is None:
+                    return None
+                return config, compile_executor.submit(compile_fn, config)
+
+            pending = submit_next()
+            while pending is not None:
+                config, compile_future = pending
+                pending = submit_next() if self.prefetch_compile else None
+                ref_latency = None
+                try:
+                    jit_context = compile_future.result(timeout=self.timeout)
+                    # Use ThreadPoolExecutor to enforce timeout on target_fn execution
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                        future = executor.submit(target_fn, jit_context)
+                        latency, ref_latency = future.result(timeout=self.timeout)
+                except concurrent.futures.TimeoutError:
+                    logging.error(
+                        f"Timeout exceeded for config {config}. Skipping this configuration.")
+                    # A timed-out compile keeps occupying the single compile worker; wait for it
+                    # so that the timeout of the next config does not run while it is queued.
+                    concurrent.futures.wait([compile_future])
+                    continue
+                except Exception as e:
+                    logging.error(f"An error occurred while testing config {config}: {e}")
+                    continue
+                finally:
+                    if not self.prefetch_compile:
+                        pending = submit_next()
+
+                logging.info(f"Config {config} latency: {latency}")
+
+                progress_bar.set_postfix({"best_latency": best_latency})
+
+                if latency < best_latency:
+                    best_latency = latency
+                    best_config = config
+                tqdm.write(f"Tuned Latency {latency} with config {config}")
         return best_latency, best_config, ref_latency
 
     def __call__(self, *args: Any, **kwds: Any) -> Any:
@@ -139,13 +170,31 @@ def autotune(configs: Any,
              keys: List[str],
              warmup: int = 25,
              rep: int = 100,
-             timeout: int = 100) -> Callable:
+             timeout: int = 100,
+             use_cuda_graph: bool = False,
+             prefetch_compile: bool = False) -> Callable:
     """
     Decorator for tl program
+
+    If `use_cuda_graph` is set, the measured repetitions of each config are
+    captured into a CUDA graph and replayed to remove the launch overhead.
+    It requires a cuda target and is not supported by the "tvm" profiler.
+
+    If `prefetch_compile` is set, the next config is compiled while the current
+    one is profiled. This shortens tuning, but the compile thread may hold the
+    GIL inside the timed region and add noise to the measured latencies.
     """
 
     def decorator(fn: Callable) -> Autotuner:
-        return Autotuner(fn, configs=configs, keys=keys, warmup=warmup, rep=rep, timeout=timeout)
+        return Autotuner(
+            fn,
+            configs=configs,
+            keys=keys,
+            warmup=warmup,
+            rep=rep,
+            timeout=timeout,
+            use_cuda_graph=use_cuda_graph,
+            prefetch_compile=prefetch_compile)
 
     return decorator
 
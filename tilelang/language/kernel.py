@@ -2,8 +2,8 @@
 # Licensed under the MIT License.
 """The language interface for tl programs."""
 
+import math
 from typing import Union, List, Tuple, Optional
-from collections import deque
 from tvm import tir
 from tvm.tir import Var
 from tvm.script.ir_builder.tir.frame import TIRFrame, BlockFrame
@@ -13,12 +13,14 @@ from tilelang import _ffi_api
 
 class FrameStack:
     """
-    A simple stack-like wrapper around a deque that provides
+    A simple stack-like wrapper around a list that provides
     push, pop, and top methods for convenience.
     """
 
+    __slots__ = ("_stack",)
+
     def __init__(self):
-        self._stack = deque()
+        self._stack = []
 
     def push(self, item):
         """Pushes an item onto the top of the stack."""
@@ -54,7 +56,7 @@ class FrameStack:
         return bool(self._stack)
 
 
-# Use our new FrameStack instead of a plain list or deque
+# Use our new FrameStack instead of a plain list
 _kernel_launch_frame_stack = FrameStack()
 
 
@@ -73,11 +75,9 @@ class KernelLaunchFrame(TIRFrame):
         """
         super().__enter__()
         _kernel_launch_frame_stack.push(self)
-        # If we have exactly 5 frames, return the single iter_var.var.
-        if len(self.frames) == 5:
-            return self.frames[0].iter_var.var
+        frames = self.frames
 
-        last_block_frame = self.frames[-1]
+        last_block_frame = frames[-1]
         assert isinstance(last_block_frame,
                           BlockFrame), f"Last frame must be a block frame, got {last_block_frame}"
 
@@ -85,20 +85,31 @@ class KernelLaunchFrame(TIRFrame):
 
         if maybe_cpu:
             # CPU kernel frame, return a list of for frame items.
-            return [frame.vars[0] for frame in self.frames[0:-1]]
-        else:
-            # Otherwise, return a list of iter_var.var objects (excluding the last 4 frames).
-            # As 4 frames for threadIdx.x, threadIdx.y, threadIdx.z and block frame with attributes
-            return [frame.iter_var.var for frame in self.frames[0:-4]]
+            return [frame.vars[0] for frame in frames[0:-1]]
+
+        # The frames are immutable once the launch frame is constructed, cache the
+        # launch extents to avoid crossing the FFI boundary on every query.
+        # Block extents may be symbolic, so they are only converted on access.
+        self._block_extents = tuple(frame.iter_var.dom.extent for frame in frames[0:-4])
+        self._thread_extents = tuple(int(frame.iter_var.dom.extent) for frame in frames[-4:-1])
+
+        # If we have exactly 5 frames, return the single iter_var.var.
+        if len(frames) == 5:
+            return frames[0].iter_var.var
+
+        # Otherwise, return a list of iter_var.var objects (excluding the last 4 frames).
+        # As 4 frames for threadIdx.x, threadIdx.y, threadIdx.z and block frame with attributes
+        return [frame.iter_var.var for frame in frames[0:-4]]
 
     def __exit__(self, ptype, value, trace):
         """
-        Exits the KernelLaunchFrame scope and pops this frame from the stack,
-        but only if it's indeed the topmost frame.
+        Exits the KernelLaunchFrame scope and pops this frame from the stack.
+        Frames are strictly LIFO under the with protocol, so the topmost frame
+        is only checked in debug mode.
         """
-        # Check if this frame is the current top before popping.
-        if _kernel_launch_frame_stack.top() is self:
-            _kernel_launch_frame_stack.pop()
+        if __debug__:
+            assert _kernel_launch_frame_stack.top() is self, "KernelLaunchFrame exited out of order"
+        _kernel_launch_frame_stack.pop()
         super().__exit__(ptype, value, trace)
 
     @classmethod
@@ -114,16 +125,14 @@ class KernelLaunchFrame(TIRFrame):
         Returns the block extent for the given dimension.
         dim=0 corresponds to blockIdx.x, dim=1 to blockIdx.y, and dim=2 to blockIdx.z.
         """
-        iter_var = self.frames[dim].iter_var
-        return int(iter_var.dom.extent)
+        return int(self._block_extents[dim])
 
     def get_thread_extent(self, dim: int) -> int:
         """
         Returns the thread extent for the given dimension.
         dim=0 corresponds to threadIdx.x, dim=1 to threadIdx.y, and dim=2 to threadIdx.z.
         """
-        iter_var = self.frames[-4 + dim].iter_var
-        return int(iter_var.dom.extent)
+        return self._thread_extents[dim]
 
     def get_thread_binding(self, dim: int = 0) -> Var:
         """
@@ -143,10 +152,7 @@ class KernelLaunchFrame(TIRFrame):
         """
         Returns the thread indices from the topmost frame.
         """
-        num_threads: int = 1
-        for thread_dim in range(3):
-            num_threads *= self.get_thread_extent(thread_dim)
-        return num_threads
+        return math.prod(self._thread_extents)
 
     @property
     def blocks(self) -> List[Var]:
@@ -2,6 +2,7 @@
 # Licensed under the MIT License.
 """The profiler and convert to torch utils"""
 
+import ctypes
 from typing import List, Literal, Optional, Callable
 from functools import partial
 import torch
@@ -18,6 +19,9 @@ from tilelang.utils.tensor import (
     adapt_torch2tvm,
 )
 
+# Device module types that can be timed with the tvm time evaluator
+TVM_PROFILER_TARGETS = frozenset({"cuda", "hip"})
+
 
 class Profiler(TorchDLPackKernelAdapter):
 
@@ -31,10 +35,14 @@ class Profiler(TorchDLPackKernelAdapter):
         super().__init__(mod, params, result_idx)
         self.supply = get_tensor_supply(supply_type)
 
-    def _get_inputs(self, with_output=False):
+    def _get_inputs(self, with_output=False, input_tensors=None):
+        # Reuse the given input tensors for the non-output params if provided
+        inputs = iter(input_tensors) if input_tensors is not None else None
         ins = []
         for i in range(len(self.params)):
-            if with_output or i not in self.result_idx:
+            if i not in self.result_idx:
+                ins.append(self.supply(self.params[i]) if inputs is None else next(inputs))
+            elif with_output:
                 ins.append(self.supply(self.params[i]))
         return ins
 
@@ -92,6 +100,12 @@ class Profiler(TorchDLPackKernelAdapter):
             func = self.__call__
         return func(*ins)
 
+    def _get_target(self):
+        target = "cuda"
+        with suppress(Exception):
+            target = self.mod.imported_modules[0].type_key
+        return target
+
     def do_bench(
         self,
         func: Optional[Callable] = None,
@@ -101,12 +115,19 @@ class Profiler(TorchDLPackKernelAdapter):
         n_repeat: int = 1,
         profiler: Literal["torch", "tvm", "auto"] = "auto",
         input_tensors: List[torch.Tensor] = None,
+        use_cuda_graph: bool = False,
     ):
         if func is None:
             # set default value if not provided
             func = self.mod
             profiler = "tvm"
 
+        if use_cuda_graph:
+            # The graph capture binds the tvm cuda stream, and the tvm time evaluator
+            # (used alone by "tvm" and alongside torch by "auto") is never captured
+            assert profiler != "tvm", "use_cuda_graph is not supported by the tvm profiler"
+            assert self._get_target() == "cuda", "use_cuda_graph requires a cuda target"
+
         if profiler == "torch":
             ins = self._get_inputs() if input_tensors is None else input_tensors
             bench_func = partial(func, *ins)
@@ -116,15 +137,12 @@ class Profiler(TorchDLPackKernelAdapter):
                 rep=rep,
                 _n_warmup=n_warmup,
                 _n_repeat=n_repeat,
+                use_cuda_graph=use_cuda_graph,
             )
         elif profiler == "tvm":
             ins = (self._get_inputs(with_output=True) if input_tensors is None else input_tensors)
-            target = "cuda"
-
-            with suppress(Exception):
-                target = self.mod.imported_modules[0].type_key
-
-            assert target in ["cuda", "hip"], f"Unknown target: {target}"
+            target = self._get_target()
+            assert target in TVM_PROFILER_TARGETS, f"Unknown target: {target}"
 
             device = tvm.cuda(0) if target == "cuda" else tvm.rocm(0)
             time_evaluator = self.mod.time_evaluator(
@@ -135,7 +153,7 @@ class Profiler(TorchDLPackKernelAdapter):
         elif profiler == "auto":
             # TODO(lei): select appropriate profiler based on the function
             # class
-            ins = self._get_inputs()
+            ins = self._get_inputs(input_tensors=input_tensors)
             bench_func = partial(func, *ins)
             torch_res = do_bench(
                 bench_func,
@@ -143,9 +161,10 @@ class Profiler(TorchDLPackKernelAdapter):
                 rep=rep,
                 _n_warmup=n_warmup,
                 _n_repeat=n_repeat,
+                use_cuda_graph=use_cuda_graph,
             )
 
-            ins = self._get_inputs(with_output=True)
+            ins = self._get_inputs(with_output=True, input_tensors=input_tensors)
             time_evaluator = self.mod.time_evaluator(
                 self.mod.entry_name, tvm.cuda(0), number=rep, repeat=n_repeat)
             tvm_inputs = [adapt_torch2tvm(inp) for inp in ins]
@@ -165,6 +184,7 @@ def do_bench(
     quantiles=None,
     fast_flush=True,
     return_mode="mean",
+    use_cuda_graph=False,
 ):
     """
     Benchmark the runtime of the provided function. By default, return the median runtime of :code:`fn` along with
@@ -182,6 +202,11 @@ def do_bench(
     :type quantiles: list[float]
     :param fast_flush: Use faster kernel to flush L2 between measurements
     :type fast_flush: bool
+    :param use_cuda_graph: Capture the repetitions into a CUDA graph and time a single replay,
+        removing the per-launch CPU overhead. The L2 cache is not flushed between the captured
+        repetitions and only the mean latency per repetition is measured. CUDA only, kernels
+        launched through tvm are captured by binding the tvm cuda stream.
+    :type use_cuda_graph: bool
     """
     assert return_mode in ["min", "max", "mean", "median"]
     fn()
@@ -213,34 +238,72 @@ def do_bench(
         n_warmup = _n_warmup
     if _n_repeat > 0:
         n_repeat = _n_repeat
-    start_event = [torch.cuda.Event(enable_timing=True) for i in range(n_repeat)]
-    end_event = [torch.cuda.Event(enable_timing=True) for i in range(n_repeat)]
-    # Warm-up
-    for _ in range(n_warmup):
-        fn()
-    # Benchmark
-    for i in range(n_repeat):
-        # we don't want `fn` to accumulate gradient values
-        # if it contains a backward pass. So we clear the
-        # provided gradients
-        if grad_to_none is not None:
-            for x in grad_to_none:
-                x.grad = None
-        # we clear the L2 cache before each run
-        cache.zero_()
-        # record time of `fn`
-        start_event[i].record()
-        fn()
-        end_event[i].record()
-    # Record clocks
-    torch.cuda.synchronize()
-    times = torch.tensor(
-        [s.elapsed_time(e) for s, e in zip(start_event, end_event)],
-        dtype=torch.float,
-    )
+    if use_cuda_graph:
+        times = torch.tensor([_bench_cuda_graph(fn, n_warmup, n_repeat)], dtype=torch.float)
+    else:
+        start_event = [torch.cuda.Event(enable_timing=True) for i in range(n_repeat)]
+        end_event = [torch.cuda.Event(enable_timing=True) for i in range(n_repeat)]
+        # Warm-up
+        for _ in range(n_warmup):
+            fn()
+        # Benchmark
+        for i in range(n_repeat):
+            # we don't want `fn` to accumulate gradient values
+            # if it contains a backward pass. So we clear the
+            # provided gradients
+            if grad_to_none is not None:
+                for x in grad_to_none:
+                    x.grad = None
+            # we clear the L2 cache before each run
+            cache.zero_()
+            # record time of `fn`
+            start_event[i].record()
+            fn()
+            end_event[i].record()
+        # Record clocks
+        torch.cuda.synchronize()
+        times = torch.tensor(
+            [s.elapsed_time(e) for s, e in zip(start_event, end_event)],
+            dtype=torch.float,
+        )
     if quantiles is not None:
         ret = torch.quantile(times, torch.tensor(quantiles, dtype=torch.float)).tolist()
         if len(ret) == 1:
             ret = ret[0]
         return ret
     return getattr(torch, return_mode)(times).item()
+
+
+def _bench_cuda_graph(fn, n_warmup, n_repeat):
+    """
+    Capture `n_repeat` calls of `fn` into a CUDA graph and return the
+    latency per call (in ms) of a single replay.
+    """
+    stream = torch.cuda.Stream()
+    # Warm up on the side stream, as required before capturing
+    stream.wait_stream(torch.cuda.current_stream())
+    with torch.cuda.stream(stream):
+        for _ in range(n_warmup):
+            fn()
+    torch.cuda.current_stream().wait_stream(stream)
+
+    # Kernels launched through the tvm runtime use the tvm stream of the device,
+    # bind it to the capture stream so that they are recorded into the graph
+    device = tvm.cuda(torch.cuda.current_device())
+    device.set_raw_stream(ctypes.c_void_p(stream.cuda_stream))
+    graph = torch.cuda.CUDAGraph()
+    try:
+        with torch.cuda.graph(graph, stream=stream):
+            for _ in range(n_repeat):
+                fn()
+    finally:
+        device.set_raw_stream(ctypes.c_void_p(None))
+    torch.cuda.synchronize()
+
+    start_event = torch.cuda.Event(enable_timing=True)
+    end_event = torch.cuda.Event(enable_timing=True)
+    start_event.record()
+    graph.replay()
+    end_event.record()
+    torch.cuda.synchronize()
+    return start_event.elapsed_time(end_event) / n_repeat
@@ -1,24 +1,27 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
+import functools
 from typing import Literal, Union
 from tilelang import tvm as tvm
 from tvm.target import Target
 from tvm.contrib import rocm
 from tilelang.contrib import nvcc
 
-AVALIABLE_TARGETS = {
+AVALIABLE_TARGETS = frozenset({
     "auto",
     "cuda",
     "hip",
     "c",  # represent c source backend
     "llvm",
-}
+})
 
 
+@functools.lru_cache(maxsize=1)
 def check_cuda_availability() -> bool:
     """
     Check if CUDA is available on the system by locating the CUDA path.
+    The probe result is cached for the lifetime of the process.
     Returns:
         bool: True if CUDA is available, False otherwise.
     """
@@ -29,9 +32,11 @@ def check_cuda_availability() -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=1)
 def check_hip_availability() -> bool:
     """
     Check if HIP (ROCm) is available on the system by locating the ROCm path.
+    The probe result is cached for the lifetime of the process.
     Returns:
         bool: True if HIP is available, False otherwise.
     """
@@ -59,7 +64,16 @@ def determine_target(target: Union[str, Target, Literal["auto"]] = "auto",
         ValueError: If no CUDA or HIP is available and the target is "auto".
         AssertionError: If the target is invalid.
     """
+    # Target objects are validated as-is and bypass the cache
+    if isinstance(target, Target):
+        return Target(target) if return_object else target
 
+    return _determine_target(target, return_object)
+
+
+@functools.lru_cache(maxsize=8)
+def _determine_target(target: Union[str, Literal["auto"]],
+                      return_object: bool = False) -> Union[str, Target]:
     return_var: Union[str, Target] = target
 
     if target == "auto":
@@ -76,8 +90,7 @@ def determine_target(target: Union[str, Target, Literal["auto"]] = "auto",
             raise ValueError("No CUDA or HIP available on this system.")
     else:
         # Validate the target if it's not "auto"
-        assert isinstance(
-            target, Target) or target in AVALIABLE_TARGETS, f"Target {target} is not supported"
+        assert target in AVALIABLE_TARGETS, f"Target {target} is not supported"
         return_var = target
 
     if return_object:
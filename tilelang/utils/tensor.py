@@ -2,6 +2,7 @@
 # Licensed under the MIT License.
 """The profiler and convert to torch utils"""
 from enum import Enum
+from functools import lru_cache
 import torch
 from tvm.relay import TensorType
 from tvm.runtime import ndarray
@@ -17,6 +18,7 @@ class TensorSupplyType(Enum):
     One = 6
 
 
+@lru_cache(maxsize=32)
 def map_torch_type(intype):
     typemap = {
         'e4m3_float8': torch.float8_e4m3fn,
@@ -47,41 +49,52 @@ def adapt_torch2tvm(arg):
     return arg
 
 
+def _supply_integer(shape, dtype, device):
+    if dtype in float8_dtype_map:
+        return torch.randint(
+            low=-128, high=128, size=shape, device=device, dtype=torch.int8).to(dtype)
+    if not dtype.is_floating_point and not dtype.is_signed:
+        return torch.randint(low=0, high=3, size=shape, device=device, dtype=dtype)
+    return torch.randint(low=-2, high=3, size=shape, device=device, dtype=dtype)
+
+
+_TENSOR_SUPPLY_DISPATCH = {
+    TensorSupplyType.Integer:
+        _supply_integer,
+    TensorSupplyType.Uniform:
+        lambda shape, dtype, device: torch.empty(*shape, device=device, dtype=dtype).uniform_(
+            -1.0, 1.0),
+    TensorSupplyType.Normal:
+        lambda shape, dtype, device: torch.empty(*shape, device=device, dtype=dtype).normal_(
+            -1.0, 1.0),
+    TensorSupplyType.Randn:
+        lambda shape, dtype, device: torch.randn(*shape, device=device).to(dtype),
+    TensorSupplyType.Zero:
+        lambda shape, dtype, device: torch.zeros(*shape, device=device, dtype=dtype),
+    TensorSupplyType.One:
+        lambda shape, dtype, device: torch.ones(*shape, device=device, dtype=dtype),
+}
+
+
 def get_tensor_supply(supply_type: TensorSupplyType):
+    if supply_type not in _TENSOR_SUPPLY_DISPATCH:
+        raise NotImplementedError(supply_type)
+    supply = _TENSOR_SUPPLY_DISPATCH[supply_type]
+    # int8 tensors are filled with ones instead of random floating point values
+    int8_as_ones = supply_type in (TensorSupplyType.Uniform, TensorSupplyType.Normal)
+    # The current device is resolved on first use and stays constant afterwards
+    device = None
 
     def get_tensor(tensor: TensorType) -> torch.Tensor:
-        dtype = map_torch_type(str(tensor.dtype))
-        device = torch.cuda.current_device()
+        nonlocal device
+        if device is None:
+            device = torch.cuda.current_device()
 
-        shape = list(map(int, tensor.shape))
-        if dtype == torch.int8 and supply_type in [
-                TensorSupplyType.Uniform,
-                TensorSupplyType.Normal,
-        ]:
-            return torch.ones(*shape, device=device, dtype=dtype)
-
-        if supply_type == TensorSupplyType.Integer:
-            is_unsigned = tensor.dtype.startswith("uint")
-            is_float8 = tensor.dtype.endswith("float8")
-            if is_unsigned:
-                return torch.randint(low=0, high=3, size=shape, device=device, dtype=dtype)
-            elif is_float8:
-                return torch.randint(
-                    low=-128, high=128, size=shape, device=device, dtype=torch.int8).to(dtype)
-            else:
-                return torch.randint(low=-2, high=3, size=shape, device=device, dtype=dtype)
-        elif supply_type == TensorSupplyType.Uniform:
-            return torch.empty(*shape, device=device, dtype=dtype).uniform_(-1.0, 1.0)
-        elif supply_type == TensorSupplyType.Normal:
-            return torch.empty(*shape, device=device, dtype=dtype).normal_(-1.0, 1.0)
-        elif supply_type == TensorSupplyType.Randn:
-            return torch.randn(*shape, device=device).to(dtype)
-        elif supply_type == TensorSupplyType.Zero:
-            return torch.zeros(*shape, device=device, dtype=dtype)
-        elif supply_type == TensorSupplyType.One:
+        dtype = map_torch_type(str(tensor.dtype))
+        shape = tuple(map(int, tensor.shape))
+        if int8_as_ones and dtype == torch.int8:
             return torch.ones(*shape, device=device, dtype=dtype)
-        else:
-            raise NotImplementedError(supply_type)
+        return supply(shape, dtype, device)
 
     return get_tensor
 
@@ -119,17 +132,14 @@ def torch_assert_close(
     """
     import torch
 
-    # Compute the absolute difference between the two tensors
-    diff = torch.abs(tensor_a - tensor_b)
-
-    # Compute the maximum allowable difference for each element
-    max_diff = atol + rtol * torch.abs(tensor_b)
-
-    # Identify elements where the difference exceeds the maximum allowable difference
-    mismatched = diff > max_diff
-
-    # Count the number of mismatched elements
-    num_mismatched = mismatched.sum().item()
+    # Count the elements where |a - b| exceeds atol + rtol * |b|. Only two temporaries
+    # are allocated, the tolerance and the difference, the rest is computed in place
+    max_diff = torch.abs(tensor_b)
+    if not max_diff.is_floating_point():
+        # Integer tensors cannot hold the scaled tolerance
+        max_diff = max_diff.float()
+    max_diff.mul_(rtol).add_(atol)
+    num_mismatched = (tensor_a - tensor_b).abs_().gt_(max_diff).count_nonzero().item()
 
     # Calculate the total number of elements in the tensor
     total_elements = tensor_a.numel()
@@ -142,12 +152,13 @@ def torch_assert_close(
         print(f"Number of mismatched elements: {num_mismatched} / {total_elements} "
               f"(allowed: {max_allowed_mismatched})")
 
-    # Check if the number of mismatched elements exceeds the allowed threshold
-    if num_mismatched > max_allowed_mismatched:
-        raise AssertionError(
-            f"Too many mismatched elements: {num_mismatched} > {max_allowed_mismatched} "
-            f"({max_mismatched_ratio * 100:.2f}% allowed). "
-            f"Greatest absolute difference: {diff.max().item()}, "
-            f"Greatest relative difference: {(diff / (torch.abs(tensor_b) + 1e-12)).max().item()}.")
-    else:
+    # The common passing case returns early, the statistics below are only needed for the error
+    if num_mismatched <= max_allowed_mismatched:
         return True
+
+    diff = torch.abs(tensor_a - tensor_b)
+    raise AssertionError(
+        f"Too many mismatched elements: {num_mismatched} > {max_allowed_mismatched} "
+        f"({max_mismatched_ratio * 100:.2f}% allowed). "
+        f"Greatest absolute difference: {diff.max().item()}, "
+        f"Greatest relative difference: {(diff / (torch.abs(tensor_b) + 1e-12)).max().item()}.")